@@ -19,11 +19,9 @@ class DeviceDisconnectedException(Exception):
 async def find_device_addresses(name: str) -> List[str]:
     logging.info(f'Detecting "{name}"...')
     devices = await BleakScanner.discover()
-    results = []
-    for d in devices:
-        if d.name is not None and name in d.name.lower():
-            logging.info(f"Found {name} at {d.address}")
-            results.append(d.address)
+    name_lower = name.lower()
+    results = [d.address for d in devices if d.name and name_lower in d.name.lower()]
+    logging.info(f'Found {len(results)} "{name}" device(s): {", ".join(results)}')
     logging.debug(f'Detecting "{name}" DONE')
     return results
 
@@ -115,10 +113,8 @@ class BLE:
             await self.ensure_connected()
             return await self.__client.read_gatt_char(handle)
         except BleakError as e:
-            if (
-                str(e).lower() == "disconnected"
-                or str(e).lower().find("turned off") >= 0
-            ):
+            err_msg = str(e).lower()
+            if "disconnected" in err_msg or "turned off" in err_msg:
                 raise DeviceDisconnectedException
             raise e
 
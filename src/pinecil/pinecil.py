@@ -1,7 +1,8 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import struct
 import logging
 import asyncio
+import functools
 from .pinecil_setting_limits import value_limits
 from .pinecil_setting_limits import temperature_limits
 from .crx_uuid_name_map import (
@@ -14,10 +15,48 @@ from .crx_uuid_name_map import (
 from .ble import (
     BleakGATTCharacteristic,
     BLE,
+    DeviceNotFoundException,
     find_device_addresses,
 )
 import time
 
+_U16 = struct.Struct("<H")
+_LIVE_DATA_KEYS = (
+    "LiveTemp",
+    "SetTemp",
+    "Voltage",
+    "HandleTemp",
+    "PWMLevel",
+    "PowerSource",
+    "TipResistance",
+    "Uptime",
+    "MovementTime",
+    "MaxTipTempAbility",
+    "uVoltsTip",
+    "HallSensor",
+    "OperatingMode",
+    "Watts",
+)
+_LIVE_DATA_STRUCT = struct.Struct(f"<{len(_LIVE_DATA_KEYS)}I")
+_SETTINGS_NAMES_BY_VERSION = {
+    "2.20": names_v220,
+    "2.21beta1": names_v221beta1,
+    "2.21beta2": names_v221beta2,
+}
+_BULK_DATA_NAMES_BY_VERSION = {
+    "2.20": bulk_data_names_v220,
+    "2.21beta1": bulk_data_names_v220,
+    "2.21beta2": bulk_data_names_v221beta2,
+}
+_ALL_SETTING_NAMES = frozenset(names_v220.values()) | frozenset(
+    names_v221beta1.values()
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _live_data_struct(num_of_values: int) -> struct.Struct:
+    return struct.Struct(f"<{num_of_values}I")
+
 
 class ValueOutOfRangeException(Exception):
     message = "Value out of range"
@@ -30,39 +69,33 @@ class InvalidSettingException(Exception):
 class SettingNameToUUIDMap:
     def __init__(self):
         self.names = names_v220
+        self.uuids = {v: k for k, v in self.names.items()}
 
     def set_version(self, version: str):
-        names = {
-            "2.20": names_v220,
-            "2.21beta1": names_v221beta1,
-            "2.21beta2": names_v221beta2,
-        }
-        self.names = names.get(version, names_v220)
+        self.names = _SETTINGS_NAMES_BY_VERSION.get(version, names_v220)
+        self.uuids = {v: k for k, v in self.names.items()}
 
     def get_name(self, uuid: str) -> str:
         return self.names.get(uuid, uuid)
 
     def get_uuid(self, name: str) -> str:
-        return next((k for k, v in self.names.items() if v == name), name)
+        return self.uuids.get(name, name)
 
 
 class BulkDataToUUIDMap:
     def __init__(self):
         self.names = bulk_data_names_v220
+        self.uuids = {v: k for k, v in self.names.items()}
 
     def set_version(self, version: str):
-        names = {
-            "2.20": bulk_data_names_v220,
-            "2.21beta1": bulk_data_names_v220,
-            "2.21beta2": bulk_data_names_v221beta2,
-        }
-        self.names = names.get(version, names_v220)
+        self.names = _BULK_DATA_NAMES_BY_VERSION.get(version, bulk_data_names_v220)
+        self.uuids = {v: k for k, v in self.names.items()}
 
     def get_name(self, uuid: str) -> str:
         return self.names.get(uuid, uuid)
 
     def get_uuid(self, name: str) -> str:
-        return next((k for k, v in self.names.items() if v == name), name)
+        return self.uuids.get(name, name)
 
 
 class Pinecil:
@@ -79,12 +112,17 @@ class Pinecil:
         self.settings_map = SettingNameToUUIDMap()
         self.bulk_data_map = BulkDataToUUIDMap()
         self.crx_settings: List[BleakGATTCharacteristic] = []
+        self.crx_settings_by_uuid: Dict[str, BleakGATTCharacteristic] = {}
+        self.crx_temp_unit: Optional[BleakGATTCharacteristic] = None
         self.crx_bulk_data: BleakGATTCharacteristic
         self.bulk_data_to_read: str = "BulkData"
         self.is_initialized = False
-        self.is_getting_settings = False
+        # created on first use: on python 3.9 a Lock binds to the loop that
+        # exists when it is constructed, which may not be the one running later
+        self.__settings_lock: Optional[asyncio.Lock] = None
         self.__last_read_settings = {}
-        self.__last_read_settings_time = 0
+        # monotonic clock may start near zero, so don't treat 0 as "just read"
+        self.__last_read_settings_monotonic = float("-inf")
         self.unique_id = ""
         self.build_version = ""
 
@@ -131,35 +169,46 @@ class Pinecil:
         await self.__set_ble_uuids_based_on_version()
 
         self.crx_settings = await self.ble.get_characteristics(self.settings_uuid)
+        self.crx_settings_by_uuid = {crx.uuid: crx for crx in self.crx_settings}
+        self.crx_temp_unit = self.crx_settings_by_uuid.get(
+            self.settings_map.get_uuid(self.temp_unit_crx)
+        )
         bulk_crx = await self.ble.get_characteristics(self.bulk_data_uuid)
-        for crx in bulk_crx:
-            if crx.uuid == self.bulk_data_map.get_uuid(self.bulk_data_to_read):
-                self.crx_bulk_data = crx
-                break
-        self.unique_id, self.build_version = await self.__get_pinecil_info()
+        bulk_crx_by_uuid = {crx.uuid: crx for crx in bulk_crx}
+        bulk_data_uuid = self.bulk_data_map.get_uuid(self.bulk_data_to_read)
+        if bulk_data_uuid in bulk_crx_by_uuid:
+            self.crx_bulk_data = bulk_crx_by_uuid[bulk_data_uuid]
+        self.unique_id, self.build_version = await self.__get_pinecil_info(
+            bulk_crx_by_uuid.get(self.bulk_data_map.get_uuid("DeviceID")),
+            bulk_crx_by_uuid.get(self.bulk_data_map.get_uuid("Build")),
+        )
         self.is_initialized = True
 
     async def __read_setting(self, crx: BleakGATTCharacteristic) -> Tuple[str, int]:
         raw_value = await self.ble.read_characteristic(crx)
-        number = struct.unpack("<H", raw_value)[0]
+        number = _U16.unpack(raw_value)[0]
         return self.settings_map.get_name(crx.uuid), number
 
-    async def __get_pinecil_info(self) -> Tuple[str, str]:
+    async def __get_pinecil_info(
+        self,
+        crx_device_id: Optional[BleakGATTCharacteristic],
+        crx_build: Optional[BleakGATTCharacteristic],
+    ) -> Tuple[str, str]:
         try:
             device_id = ""
             build_version = ""
-            characteristics = await self.ble.get_characteristics(self.bulk_data_uuid)
-            for crx in characteristics:
-                if crx.uuid == self.bulk_data_map.get_uuid("DeviceID"):
-                    raw_value = await self.ble.read_characteristic(crx)
-                    n = struct.unpack("<Q", raw_value)[0]
-                    # using algorithm from here:
-                    # https://github.com/Ralim/IronOS/commit/eb5d6ea9fd6acd221b8880650728e13968e54d3d
-                    unique_id = (n & 0xFFFFFFFF) ^ ((n >> 32) & 0xFFFFFFFF)
-                    device_id = f"{unique_id:X}"
-                elif crx.uuid == self.bulk_data_map.get_uuid("Build"):
-                    raw_value = await self.ble.read_characteristic(crx)
-                    build_version = raw_value.decode("utf-8").strip("v")
+            if crx_device_id is not None:
+                raw_value = await self.ble.read_characteristic(crx_device_id)
+                if len(raw_value) != 8:
+                    raise ValueError(f"DeviceID must be 8 bytes, got {len(raw_value)}")
+                n = int.from_bytes(raw_value, "little")
+                # using algorithm from here:
+                # https://github.com/Ralim/IronOS/commit/eb5d6ea9fd6acd221b8880650728e13968e54d3d
+                unique_id = (n & 0xFFFFFFFF) ^ (n >> 32)
+                device_id = f"{unique_id:X}"
+            if crx_build is not None:
+                raw_value = await self.ble.read_characteristic(crx_build)
+                build_version = raw_value.decode("utf-8").strip("v")
             return device_id, build_version
         except Exception:
             return "", ""
@@ -171,13 +220,12 @@ class Pinecil:
             Dict[str, int]: key-value pairs of setting name and value
         """
         logging.info("REQUEST FOR SETTINGS")
-        while self.is_getting_settings:
-            await asyncio.sleep(0.5)
-        if time.time() - self.__last_read_settings_time < 2:
-            return self.__last_read_settings
-        try:
+        if self.__settings_lock is None:
+            self.__settings_lock = asyncio.Lock()
+        async with self.__settings_lock:
+            if time.monotonic() - self.__last_read_settings_monotonic < 2:
+                return self.__last_read_settings
             logging.info("Reading all settings")
-            self.is_getting_settings = True
             if not self.is_connected:
                 await self.connect()
             tasks = [
@@ -188,27 +236,20 @@ class Pinecil:
             settings = dict(results)
             logging.info("Reading all settings DONE")
             self.__last_read_settings = settings
-            self.__last_read_settings_time = time.time()
+            self.__last_read_settings_monotonic = time.monotonic()
             return settings
-        except Exception as e:
-            raise e
-        finally:
-            self.is_getting_settings = False
 
     async def __ensure_valid_temperature(self, setting: str, temperature: int):
-        characteristics = await self.ble.get_characteristics(self.settings_uuid)
-        temp_uuid = self.settings_map.get_uuid(self.temp_unit_crx)
-        for crx in characteristics:
-            if crx.uuid == temp_uuid:
-                raw_value = await self.ble.read_characteristic(crx)
-                temp_unit = struct.unpack("<H", raw_value)[0]
-                within_limit = temperature_limits[setting][temp_unit]
-                if not within_limit(temperature):
-                    logging.warning(
-                        f"Temp. {temperature} is out of range for setting {setting}"
-                    )
-                    raise ValueOutOfRangeException
-                break
+        if self.crx_temp_unit is None:
+            return
+        raw_value = await self.ble.read_characteristic(self.crx_temp_unit)
+        temp_unit = _U16.unpack(raw_value)[0]
+        within_limit = temperature_limits[setting][temp_unit]
+        if not within_limit(temperature):
+            logging.warning(
+                f"Temp. {temperature} is out of range for setting {setting}"
+            )
+            raise ValueOutOfRangeException
 
     async def set_one_setting(self, setting: str, value: int):
         """Sets one setting on Pinecil.
@@ -229,13 +270,11 @@ class Pinecil:
             await self.__ensure_valid_temperature(setting, value)
         logging.info(f"Setting {value} ({type(value)}) to {setting}")
         uuid = self.settings_map.get_uuid(setting)
-        for crx in self.crx_settings:
-            if crx.uuid == uuid:
-                v = struct.pack("<H", value)
-                await self.ble.write_characteristic(crx, bytearray(v))
-                break
-        else:
+        crx = self.crx_settings_by_uuid.get(uuid)
+        if crx is None:
             raise Exception("Setting not found")
+        v = _U16.pack(value)
+        await self.ble.write_characteristic(crx, bytearray(v))
 
     async def save_to_flash(self):
         """Saves current settings to flash - settings will be preserved after reboot."""
@@ -259,25 +298,12 @@ class Pinecil:
 
     async def __read_live_data(self, crx: BleakGATTCharacteristic) -> Dict[str, int]:
         raw_value = await self.ble.read_characteristic(crx)
-        num_of_values = len(raw_value) >> 2
-        values = struct.unpack(f"<{num_of_values}I", raw_value)
-        values_map = [
-            "LiveTemp",
-            "SetTemp",
-            "Voltage",
-            "HandleTemp",
-            "PWMLevel",
-            "PowerSource",
-            "TipResistance",
-            "Uptime",
-            "MovementTime",
-            "MaxTipTempAbility",
-            "uVoltsTip",
-            "HallSensor",
-            "OperatingMode",
-            "Watts",
-        ]
-        return dict(zip(values_map, values))
+        if len(raw_value) >= _LIVE_DATA_STRUCT.size:
+            # any trailing values have no name and would be dropped by zip anyway
+            values = _LIVE_DATA_STRUCT.unpack_from(raw_value)
+        else:
+            values = _live_data_struct(len(raw_value) >> 2).unpack(raw_value)
+        return dict(zip(_LIVE_DATA_KEYS, values))
 
     async def get_live_data(self) -> Dict[str, int]:
         """Retrieves live data from Pinecil.
@@ -311,7 +337,7 @@ class Pinecil:
 
 
 def ensure_setting_exists(name: str):
-    if name not in names_v220.values() and name not in names_v221beta1.values():
+    if name not in _ALL_SETTING_NAMES:
         logging.warning(f"Setting {name} does not exist")
         raise InvalidSettingException
 
@@ -325,11 +351,34 @@ def ensure_setting_value_within_limits(name: str, value: int):
         raise ValueOutOfRangeException
 
 
-async def find_pinecils() -> List[Pinecil]:
+async def find_pinecils(auto_connect: bool = False) -> List[Pinecil]:
     """Looks for BLE devices that have 'pinecil' in their name.
 
+    Args:
+        auto_connect (bool): connect to all found devices concurrently
+
+    Raises:
+        Exception: If auto_connect is set and a device fails to connect for a
+            reason other than DeviceNotFoundException; raised only after all
+            connection attempts have finished. Devices that are not found are
+            logged and left out of the result.
+
     Returns:
         List[Pinecil]: A list of available devices
     """
     addresses = await find_device_addresses("pinecil")
-    return [Pinecil(BLE(a)) for a in addresses]
+    pinecils = [Pinecil(BLE(a)) for a in addresses]
+    if not auto_connect:
+        return pinecils
+    results = await asyncio.gather(
+        *(p.connect() for p in pinecils), return_exceptions=True
+    )
+    connected = []
+    for address, pinecil, result in zip(addresses, pinecils, results):
+        if isinstance(result, DeviceNotFoundException):
+            logging.warning(f"Could not connect to pinecil at {address}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            connected.append(pinecil)
+    return connected
@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from test_utils import (
+    resolved,
+    MockCharacteristic,
+    MockService,
+    SETTINGS_SERVICE_UUID,
+    BULK_DATA_SERVICE_UUID,
+)
+
+
+@pytest.fixture(scope="session")
+def fake_services():
+    class Svcs:
+        def __init__(self):
+            self.services = [
+                MockService(
+                    uuid=SETTINGS_SERVICE_UUID,
+                    characteristics=(
+                        MockCharacteristic(uuid="f6d80000-5a10-4eba-aa55-33e27f9bc530"),
+                        MockCharacteristic(uuid="f6d80000-5a10-4eba-aa55-33e27f9bc531"),
+                    ),
+                ),
+                MockService(
+                    uuid=BULK_DATA_SERVICE_UUID,
+                    characteristics=(
+                        MockCharacteristic(uuid="9eae1000-9d0d-48c5-aa55-33e27f9bc535"),
+                        MockCharacteristic(uuid="9eae1000-9d0d-48c5-aa55-33e27f9bc536"),
+                    ),
+                ),
+            ]
+            self.__by_uuid = {s.uuid: s for s in self.services}
+
+        def get_service(self, uuid: str):
+            return self.__by_uuid.get(uuid)
+
+        def __iter__(self):
+            return iter(self.services)
+
+    return Svcs()
+
+
+@pytest.fixture
+def mock_bleak_client(monkeypatch, fake_services):
+    client = MagicMock()
+    client.is_connected = False
+
+    def fake_connect():
+        client.is_connected = True
+
+    def client_initializer(*a, **kw):
+        client.disconnected_callback = kw.get("disconnected_callback")
+        return client
+
+    client.connect = AsyncMock(side_effect=fake_connect)
+    client.services = fake_services
+    client.written = []
+
+    def read_gatt_char(crx):
+        return resolved(b"test")
+
+    def write_gatt_char(crx, value):
+        client.written.append((crx, value))
+        return resolved()
+
+    client.read_gatt_char = read_gatt_char
+    client.write_gatt_char = write_gatt_char
+
+    monkeypatch.setattr("pinecil.ble.BleakClient", client_initializer)
+    return client
@@ -1,55 +1,146 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 from pinecil import (
     Pinecil,
     find_pinecils,
     ValueOutOfRangeException,
     InvalidSettingException,
+    DeviceNotFoundException,
 )
+from pinecil.pinecil import BulkDataToUUIDMap
 from test_data import settings as fake_settings
 from test_data import live_data as fake_live_data
-from test_utils import Method
+from test_utils import resolved, SETTINGS_SERVICE_UUID, BULK_DATA_SERVICE_UUID
 import struct
+import asyncio
+
+
+PACK_H = struct.Struct("<H").pack
+
+# names of the characteristics in test_data.settings, in the same order
+SETTING_NAMES = (
+    "SetTemperature",
+    "SleepTemperature",
+    "SleepTimeout",
+    "DCInCutoff",
+    "MinVolCell",
+    "QCMaxVoltage",
+    "DisplayRotation",
+    "MotionSensitivity",
+    "AnimLoop",
+    "AnimSpeed",
+    "AutoStart",
+    "ShutdownTimeout",
+    "CooldownBlink",
+    "AdvancedIdle",
+    "AdvancedSoldering",
+    "TemperatureUnit",
+    "ScrollingSpeed",
+    "LockingMode",
+    "PowerPulsePower",
+    "PowerPulseWait",
+    "PowerPulseDuration",
+    "VoltageCalibration",
+    "BoostTemperature",
+    "CalibrationOffset",
+    "PowerLimit",
+    "ReverseButtonTempChange",
+    "TempChangeLongStep",
+    "TempChangeShortStep",
+    "HallEffectSensitivity",
+    "AccelMissingWarningCounter",
+    "PDMissingWarningCounter",
+    "UILanguage",
+    "PDNegTimeout",
+    "ColourInversion",
+    "Brightness",
+    "LOGOTime",
+    "CalibrateCJC",
+    "BLEEnabled",
+    "PDVpdoEnabled",
+    "save_to_flash",
+    "SettingsReset",
+)
+LIVE_DATA_NAMES = (
+    "LiveTemp",
+    "SetTemp",
+    "Voltage",
+    "HandleTemp",
+    "PWMLevel",
+    "PowerSource",
+    "TipResistance",
+    "Uptime",
+    "MovementTime",
+    "MaxTipTempAbility",
+    "uVoltsTip",
+    "HallSensor",
+    "OperatingMode",
+    "Watts",
+)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mocked_settings():
     return fake_settings
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mocked_live_data():
     return fake_live_data
 
 
+class FakeBle:
+    def __init__(self, characteristics: dict):
+        """Stand-in for BLE that serves canned characteristics and records calls
+
+        Args:
+            characteristics (dict): service uuid -> list of characteristics
+        """
+        self.is_connected = False
+        self.characteristics = characteristics
+        self.calls = []
+
+    def calls_to(self, method: str) -> list:
+        return [args for name, args in self.calls if name == method]
+
+    async def ensure_connected(self):
+        self.calls.append(("ensure_connected", ()))
+        self.is_connected = True
+
+    async def get_services(self):
+        self.calls.append(("get_services", ()))
+        return list(self.characteristics)
+
+    async def get_characteristics(self, service_uuid):
+        self.calls.append(("get_characteristics", (service_uuid,)))
+        return self.characteristics.get(service_uuid, [])
+
+    def read_characteristic(self, crx):
+        self.calls.append(("read_characteristic", (crx,)))
+        return resolved(crx.raw_value)
+
+    def write_characteristic(self, crx, value):
+        self.calls.append(("write_characteristic", (crx, value)))
+        return resolved()
+
+
 @pytest.fixture
 def mock_ble(mocked_settings, mocked_live_data):
-    async def get_characteristics(uuid):
-        if uuid == "f6d80000-5a10-4eba-aa55-33e27f9bc533":
-            return mocked_settings
-        if uuid == "9eae1000-9d0d-48c5-aa55-33e27f9bc533":
-            return mocked_live_data
-        return []
-
-    async def read_crx(a):
-        return a.raw_value
-
-    mock_services = [
-        "f6d80000-5a10-4eba-aa55-33e27f9bc533",
-        "9eae1000-9d0d-48c5-aa55-33e27f9bc533",
-    ]
-    ble = MagicMock()
-    ble.is_connected = False
-
-    def fake_connect():
-        ble.is_connected = True
-
-    ble.get_characteristics = AsyncMock(side_effect=get_characteristics)
-    ble.get_services = AsyncMock(return_value=mock_services)
-    ble.ensure_connected = AsyncMock(side_effect=fake_connect)
-    ble.read_characteristic = AsyncMock(side_effect=read_crx)
-    ble.write_characteristic = AsyncMock()
-    return ble
+    return FakeBle(
+        {
+            SETTINGS_SERVICE_UUID: mocked_settings,
+            BULK_DATA_SERVICE_UUID: mocked_live_data,
+        }
+    )
+
+
+@pytest.fixture
+async def connected_pinecil(mock_ble):
+    """Pinecil after connect(), with the calls made while connecting forgotten"""
+    pinecil = Pinecil(mock_ble)
+    await pinecil.connect()
+    mock_ble.calls.clear()
+    return pinecil
 
 
 def test_device_not_connected_after_initializing(mock_ble):
@@ -57,7 +148,6 @@ def test_device_not_connected_after_initializing(mock_ble):
     assert not pinecil.is_connected
 
 
-@pytest.mark.asyncio
 async def test_find_all_pinecils():
     with patch(
         "pinecil.pinecil.find_device_addresses", return_value=["00:11:22:33:44:55"]
@@ -67,167 +157,204 @@ async def test_find_all_pinecils():
         assert isinstance(devices[0], Pinecil)
 
 
-@pytest.mark.asyncio
+async def test_find_all_pinecils_and_connect():
+    with patch(
+        "pinecil.pinecil.find_device_addresses",
+        return_value=["00:11:22:33:44:55", "66:77:88:99:aa:bb"],
+    ), patch.object(Pinecil, "connect", new_callable=AsyncMock) as connect:
+        devices = await find_pinecils(auto_connect=True)
+        assert len(devices) == 2
+        assert connect.await_count == 2
+
+
+async def test_find_all_pinecils_and_connect_skips_unreachable_devices():
+    with patch(
+        "pinecil.pinecil.find_device_addresses",
+        return_value=["00:11:22:33:44:55", "66:77:88:99:aa:bb"],
+    ), patch.object(
+        Pinecil,
+        "connect",
+        new_callable=AsyncMock,
+        side_effect=[DeviceNotFoundException, None],
+    ) as connect:
+        devices = await find_pinecils(auto_connect=True)
+        assert len(devices) == 1
+        assert connect.await_count == 2
+
+
+async def test_find_all_pinecils_and_connect_reraises_after_all_attempts():
+    with patch(
+        "pinecil.pinecil.find_device_addresses",
+        return_value=["00:11:22:33:44:55", "66:77:88:99:aa:bb"],
+    ), patch.object(
+        Pinecil,
+        "connect",
+        new_callable=AsyncMock,
+        side_effect=[RuntimeError("boom"), None],
+    ) as connect:
+        with pytest.raises(RuntimeError):
+            await find_pinecils(auto_connect=True)
+        assert connect.await_count == 2
+
+
 async def test_after_connecting_device_loads_settings_ble_characteristics(mock_ble):
     pinecil = Pinecil(mock_ble)
     await pinecil.connect()
-    assert Method(mock_ble.get_characteristics).was_called_with(
-        "f6d80000-5a10-4eba-aa55-33e27f9bc533"
+    assert (SETTINGS_SERVICE_UUID,) in mock_ble.calls_to("get_characteristics")
+    assert mock_ble.calls_to("read_characteristic")
+
+
+async def test_connecting_fetches_bulk_data_characteristics_once(mock_ble):
+    pinecil = Pinecil(mock_ble)
+    await pinecil.connect()
+    bulk_data_calls = mock_ble.calls_to("get_characteristics").count(
+        (BULK_DATA_SERVICE_UUID,)
     )
-    assert mock_ble.read_characteristic.called
+    assert bulk_data_calls == 1
 
 
-@pytest.mark.asyncio
 async def test_read_all_settings_from_v2_21beta2(mock_ble, mocked_settings):
     pinecil = Pinecil(mock_ble)
     await pinecil.connect()
     settings = await pinecil.get_all_settings()
-    assert settings["SetTemperature"] == mocked_settings[0].expected_value
-    assert settings["SleepTemperature"] == mocked_settings[1].expected_value
-    assert settings["SleepTimeout"] == mocked_settings[2].expected_value
-    assert settings["DCInCutoff"] == mocked_settings[3].expected_value
-    assert settings["MinVolCell"] == mocked_settings[4].expected_value
-    assert settings["QCMaxVoltage"] == mocked_settings[5].expected_value
-    assert settings["DisplayRotation"] == mocked_settings[6].expected_value
-    assert settings["MotionSensitivity"] == mocked_settings[7].expected_value
-    assert settings["AnimLoop"] == mocked_settings[8].expected_value
-    assert settings["AnimSpeed"] == mocked_settings[9].expected_value
-    assert settings["AutoStart"] == mocked_settings[10].expected_value
-    assert settings["ShutdownTimeout"] == mocked_settings[11].expected_value
-    assert settings["CooldownBlink"] == mocked_settings[12].expected_value
-    assert settings["AdvancedIdle"] == mocked_settings[13].expected_value
-    assert settings["AdvancedSoldering"] == mocked_settings[14].expected_value
-    assert settings["TemperatureUnit"] == mocked_settings[15].expected_value
-    assert settings["ScrollingSpeed"] == mocked_settings[16].expected_value
-    assert settings["LockingMode"] == mocked_settings[17].expected_value
-    assert settings["PowerPulsePower"] == mocked_settings[18].expected_value
-    assert settings["PowerPulseWait"] == mocked_settings[19].expected_value
-    assert settings["PowerPulseDuration"] == mocked_settings[20].expected_value
-    assert settings["VoltageCalibration"] == mocked_settings[21].expected_value
-    assert settings["BoostTemperature"] == mocked_settings[22].expected_value
-    assert settings["CalibrationOffset"] == mocked_settings[23].expected_value
-    assert settings["PowerLimit"] == mocked_settings[24].expected_value
-    assert settings["ReverseButtonTempChange"] == mocked_settings[25].expected_value
-    assert settings["TempChangeLongStep"] == mocked_settings[26].expected_value
-    assert settings["TempChangeShortStep"] == mocked_settings[27].expected_value
-    assert settings["HallEffectSensitivity"] == mocked_settings[28].expected_value
-    assert settings["AccelMissingWarningCounter"] == mocked_settings[29].expected_value
-    assert settings["PDMissingWarningCounter"] == mocked_settings[30].expected_value
-    assert settings["UILanguage"] == mocked_settings[31].expected_value
-    assert settings["PDNegTimeout"] == mocked_settings[32].expected_value
-    assert settings["ColourInversion"] == mocked_settings[33].expected_value
-    assert settings["Brightness"] == mocked_settings[34].expected_value
-
-
-@pytest.mark.asyncio
-async def test_reading_settings_while_disconnected_reconnects(mock_ble):
+    expected = {n: s.expected_value for n, s in zip(SETTING_NAMES, mocked_settings)}
+    assert settings == expected
+
+
+@pytest.mark.parametrize("method", ["get_all_settings", "get_live_data", "get_info"])
+async def test_reading_while_disconnected_reconnects(mock_ble, method):
     pinecil = Pinecil(mock_ble)
     assert not pinecil.is_connected
-    await pinecil.get_all_settings()
+    await getattr(pinecil, method)()
     assert pinecil.is_connected
 
 
-@pytest.mark.asyncio
-async def test_set_one_setting(mock_ble, mocked_settings):
-    pinecil = Pinecil(mock_ble)
-    await pinecil.connect()
+async def test_set_one_setting(connected_pinecil, mock_ble, mocked_settings):
+    pinecil = connected_pinecil
     await pinecil.set_one_setting("SetTemperature", 250)
     # SetTemperature is the first characteristic in the list of test data
     setting = mocked_settings[0]
-    packed_value = struct.pack("<H", 250)
-    assert Method(mock_ble.write_characteristic).was_called_with(setting, packed_value)
+    packed_value = PACK_H(250)
+    assert (setting, packed_value) in mock_ble.calls_to("write_characteristic")
 
 
-@pytest.mark.asyncio
-async def test_can_save_changes_to_flash(mock_ble, mocked_settings):
-    pinecil = Pinecil(mock_ble)
-    await pinecil.connect()
+async def test_can_save_changes_to_flash(connected_pinecil, mock_ble, mocked_settings):
+    pinecil = connected_pinecil
     await pinecil.save_to_flash()
     # save_to_flash is the 2nd last characteristic in the list of test data
     setting = mocked_settings[-2]
-    assert Method(mock_ble.write_characteristic).was_called_with(setting, b"\x01\x00")
+    assert (setting, PACK_H(1)) in mock_ble.calls_to("write_characteristic")
 
 
-@pytest.mark.asyncio
-async def test_updating_setting_with_invalid_value_fails(mock_ble):
-    pinecil = Pinecil(mock_ble)
-    await pinecil.connect()
+async def test_updating_setting_with_invalid_value_fails(connected_pinecil):
+    pinecil = connected_pinecil
     with pytest.raises(ValueOutOfRangeException):
         await pinecil.set_one_setting("SetTemperature", 0)
     with pytest.raises(ValueOutOfRangeException):
         await pinecil.set_one_setting("SleepTimeout", 50)
 
 
-@pytest.mark.asyncio
-async def test_updating_nonexistent_setting_fails(mock_ble):
-    pinecil = Pinecil(mock_ble)
-    await pinecil.connect()
+async def test_updating_temperature_outside_of_current_unit_range_fails(
+    connected_pinecil, mock_ble
+):
+    pinecil = connected_pinecil
+    # TemperatureUnit in test data is 0 (Celsius), so 460 is above the maximum
+    with pytest.raises(ValueOutOfRangeException):
+        await pinecil.set_one_setting("SetTemperature", 460)
+    assert not mock_ble.calls_to("write_characteristic")
+
+
+async def test_updating_temperature_does_not_look_up_characteristics(
+    connected_pinecil, mock_ble
+):
+    pinecil = connected_pinecil
+    await pinecil.set_one_setting("SetTemperature", 250)
+    assert not mock_ble.calls_to("get_characteristics")
+
+
+async def test_updating_nonexistent_setting_fails(connected_pinecil):
+    pinecil = connected_pinecil
     with pytest.raises(InvalidSettingException):
         await pinecil.set_one_setting("ThisSettingDoesNotExist", 50)
 
 
-@pytest.mark.asyncio
+def test_concurrent_requests_for_all_settings_on_pinecil_created_outside_loop(
+    mock_ble, mocked_settings
+):
+    # mirrors the README example: Pinecil(...) is built before asyncio.run(...)
+    pinecil = Pinecil(mock_ble)
+
+    async def read_settings_twice():
+        return await asyncio.gather(
+            pinecil.get_all_settings(), pinecil.get_all_settings()
+        )
+
+    first, second = asyncio.run(read_settings_twice())
+    assert first == second
+    assert len(first) == len(mocked_settings)
+
+
 async def test_requesting_all_settings_frequently_returns_cached_values(mock_ble):
     pinecil = Pinecil(mock_ble)
-    assert not mock_ble.read_characteristic.called
+    assert not mock_ble.calls_to("read_characteristic")
     await pinecil.connect()
     await pinecil.get_all_settings()
-    assert mock_ble.read_characteristic.called
-    mock_ble.read_characteristic.reset_mock()
+    assert mock_ble.calls_to("read_characteristic")
+    mock_ble.calls.clear()
     await pinecil.get_all_settings()
     await pinecil.get_all_settings()
-    assert not mock_ble.read_characteristic.called
+    assert not mock_ble.calls_to("read_characteristic")
 
 
-@pytest.mark.asyncio
-@patch("time.time")
+async def test_concurrent_requests_for_all_settings_read_device_once(
+    mock_ble, mocked_settings
+):
+    pinecil = Pinecil(mock_ble)
+    await pinecil.connect()
+    mock_ble.calls.clear()
+    first, second = await asyncio.gather(
+        pinecil.get_all_settings(), pinecil.get_all_settings()
+    )
+    assert first == second
+    assert len(mock_ble.calls_to("read_characteristic")) == len(mocked_settings)
+
+
+@patch("pinecil.pinecil.time")
 async def test_requesting_all_settings_after_2s_gets_values_from_device(
     mock_time, mock_ble
 ):
     pinecil = Pinecil(mock_ble)
-    mock_time.return_value = 100
+    mock_time.monotonic.return_value = 100
     await pinecil.connect()
     await pinecil.get_all_settings()
-    assert mock_ble.read_characteristic.called
-    mock_ble.read_characteristic.reset_mock()
-    mock_time.return_value = 101
+    assert mock_ble.calls_to("read_characteristic")
+    mock_ble.calls.clear()
+    mock_time.monotonic.return_value = 101
     await pinecil.get_all_settings()
-    assert not mock_ble.read_characteristic.called
-    mock_time.return_value = 102
+    assert not mock_ble.calls_to("read_characteristic")
+    mock_time.monotonic.return_value = 102
     await pinecil.get_all_settings()
-    assert mock_ble.read_characteristic.called
+    assert mock_ble.calls_to("read_characteristic")
 
 
-@pytest.mark.asyncio
 async def test_get_live_data(mock_ble, mocked_live_data):
     pinecil = Pinecil(mock_ble)
     await pinecil.connect()
     live_data = await pinecil.get_live_data()
-    assert live_data["LiveTemp"] == mocked_live_data[0].expected_value[0]
-    assert live_data["SetTemp"] == mocked_live_data[0].expected_value[1]
-    assert live_data["Voltage"] == mocked_live_data[0].expected_value[2]
-    assert live_data["HandleTemp"] == mocked_live_data[0].expected_value[3]
-    assert live_data["PWMLevel"] == mocked_live_data[0].expected_value[4]
-    assert live_data["PowerSource"] == mocked_live_data[0].expected_value[5]
-    assert live_data["TipResistance"] == mocked_live_data[0].expected_value[6]
-    assert live_data["Uptime"] == mocked_live_data[0].expected_value[7]
-    assert live_data["MovementTime"] == mocked_live_data[0].expected_value[8]
-    assert live_data["MaxTipTempAbility"] == mocked_live_data[0].expected_value[9]
-    assert live_data["uVoltsTip"] == mocked_live_data[0].expected_value[10]
-    assert live_data["HallSensor"] == mocked_live_data[0].expected_value[11]
-    assert live_data["OperatingMode"] == mocked_live_data[0].expected_value[12]
-    assert live_data["Watts"] == mocked_live_data[0].expected_value[13]
-
-
-@pytest.mark.asyncio
-async def test_reading_live_data_while_disconnected_reconnects(mock_ble):
+    assert live_data == dict(zip(LIVE_DATA_NAMES, mocked_live_data[0].expected_value))
+
+
+async def test_get_live_data_with_fewer_values(mock_ble, mocked_live_data):
     pinecil = Pinecil(mock_ble)
-    assert not pinecil.is_connected
-    await pinecil.get_live_data()
-    assert pinecil.is_connected
+    await pinecil.connect()
+    # older firmware does not report the trailing "Watts" value
+    short_payload = mocked_live_data[0].raw_value[:-4]
+    mock_ble.read_characteristic = lambda crx: resolved(short_payload)
+    live_data = await pinecil.get_live_data()
+    assert "Watts" not in live_data
+    assert list(live_data.values()) == mocked_live_data[0].expected_value[:-1]
 
 
-@pytest.mark.asyncio
 async def test_get_pinecil_info(mock_ble, mocked_live_data):
     pinecil = Pinecil(mock_ble)
     await pinecil.connect()
@@ -237,42 +364,41 @@ async def test_get_pinecil_info(mock_ble, mocked_live_data):
     assert info["name"] == f'Pinecil-{info["id"]}'
 
 
-@pytest.mark.asyncio
-async def test_get_pinecil_info_while_disconnected_reconnects(mock_ble):
-    pinecil = Pinecil(mock_ble)
-    assert not pinecil.is_connected
-    await pinecil.get_info()
-    assert pinecil.is_connected
-
-
 @pytest.fixture
 def mock_ble_v220(mocked_settings, mocked_live_data):
-    async def get_characteristics(uuid):
-        if uuid == "f6d75f91-5a10-4eba-a233-47d3f26a907f":
-            return mocked_settings
-        if uuid == "9eae1adb-9d0d-48c5-a6e7-ae93f0ea37b0":
-            return mocked_live_data
-        return []
-
-    async def read_crx(a):
-        return a.raw_value
-
-    mock_services = [
-        MagicMock(uuid="f6d75f91-5a10-4eba-a233-47d3f26a907f"),
-        MagicMock(uuid="9eae1adb-9d0d-48c5-a6e7-ae93f0ea37b0"),
-    ]
-    ble = MagicMock()
-    ble.is_connected = False
-    ble.get_characteristics = AsyncMock(side_effect=get_characteristics)
-    ble.get_services = AsyncMock(return_value=mock_services)
-    ble.ensure_connected = AsyncMock()
-    ble.read_characteristic = read_crx
-    return ble
-
-
-@pytest.mark.asyncio
+    return FakeBle(
+        {
+            "f6d75f91-5a10-4eba-a233-47d3f26a907f": mocked_settings,
+            "9eae1adb-9d0d-48c5-a6e7-ae93f0ea37b0": mocked_live_data,
+        }
+    )
+
+
+async def test_get_pinecil_info_ignores_malformed_device_id(
+    mocked_settings, mocked_live_data
+):
+    bulk_data, build, device_id = mocked_live_data
+    short_device_id = device_id._replace(raw_value=device_id.raw_value[:4])
+    ble = FakeBle(
+        {
+            SETTINGS_SERVICE_UUID: mocked_settings,
+            BULK_DATA_SERVICE_UUID: [bulk_data, build, short_device_id],
+        }
+    )
+    pinecil = Pinecil(ble)
+    await pinecil.connect()
+    info = await pinecil.get_info()
+    assert info["id"] == ""
+
+
 async def test_get_info_returns_2_20_build_for_older_versions(mock_ble_v220):
     pinecil = Pinecil(mock_ble_v220)
     await pinecil.connect()
     info = await pinecil.get_info()
     assert info["build"] == "2.20"
+
+
+def test_bulk_data_map_falls_back_to_2_20_names_for_unknown_versions():
+    bulk_data_map = BulkDataToUUIDMap()
+    bulk_data_map.set_version("unknown")
+    assert bulk_data_map.get_uuid("DeviceID") == "00000004-0000-1000-8000-00805f9b34fb"
@@ -1,16 +1,32 @@
-class Method:
-    def __init__(self, mocked_func):
-        self.mocked_func = mocked_func
-        self.mock_calls = mocked_func.mock_calls
-
-    def was_called_with(self, *args):
-        for call in self.mock_calls:
-            if len(call) < 2:
-                continue
-            if len(call[1]) < 1:
-                continue
-            if call[1] == args:
-                return True
-        raise AssertionError(
-            f"No call to {self.mocked_func} with args {args}:\n {self.mock_calls}"
-        )
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+# service uuids exposed by IronOS 2.21beta2 and later
+SETTINGS_SERVICE_UUID = "f6d80000-5a10-4eba-aa55-33e27f9bc533"
+BULK_DATA_SERVICE_UUID = "9eae1000-9d0d-48c5-aa55-33e27f9bc533"
+
+
+@dataclass(frozen=True)
+class MockDevice:
+    name: Optional[str]
+    address: str
+
+
+@dataclass(frozen=True)
+class MockCharacteristic:
+    uuid: str
+
+
+@dataclass(frozen=True)
+class MockService:
+    uuid: str
+    characteristics: Tuple[MockCharacteristic, ...]
+
+
+def resolved(value=None) -> asyncio.Future:
+    """Returns an already completed future, awaitable without a coroutine"""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future